@@ -1,120 +1,2396 @@
 #!/usr/bin/env python3
 
+import argparse
+import array
+import asyncio
+import bisect
+import collections
+import concurrent.futures
+import functools
+import hashlib
+import heapq
+import http
+import io
+import itertools
 import json
+import math
+import mmap
 import os
 import random
+import re
+import shutil
+import signal
+import statistics
+import sqlite3
+import struct
+import sys
+import tempfile
+import time
+import traceback
+import tracemalloc
+import unicodedata
+import urllib.parse
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 _STATE_FILE = 'state.json'
+_HASH_TABLES_DIR = 'catalogues'
+_STATE_VERSION = 2
+_STATE_HEADER = struct.Struct('<4sc32s')
+_STATE_MAGIC = b'BZFS'
+_PACKED_LENGTH = struct.Struct('<I')
+_JOURNAL_FILE = 'state.journal'
+_JOURNAL_HEADER = struct.Struct('<4sQ')
+_JOURNAL_MAGIC = b'BZFH'
+_JOURNAL_RECORD = struct.Struct('<8s?d')
+_JOURNAL_LEGACY_MAGIC = b'BZFJ'
+_JOURNAL_LEGACY_RECORD = struct.Struct('<I?d')
+_EVENTS_FILE = 'answers.log'
+_EVENTS_MAGIC = b'BZFA'
+_EVENT_RECORD = struct.Struct('<8sBBdf')
+_LATENCY_BUCKETS = [0.5 * 1.2 ** k for k in range(40)]
+_COMPACT_EVERY = 100
+_DURABILITY = ['none', 'batch', 'always']
+_FSYNC_BATCH = 16
+_SM2_INITIAL_EASE = 2.5
+_SM2_DEFAULTS = {'ease': _SM2_INITIAL_EASE, 'interval': 0, 'reps': 0, 'due': 0}
+_SM2_MINIMUM_EASE = 1.3
+_SM2_QUALITY = {True: 4, False: 1}
+_SM2_RELEARN_DELAY = 600
+_DAY = 86400
+_EXAMS_FILE = 'exams.jsonl'
+_SESSIONS_DIR = 'sessions'
+_SESSIONS_KEPT = 20
+_ROLLUPS_FILE = 'rollups.json'
+_EXAM_SIZE = 25
+_EXAM_MINUTES = 30
+_EXAM_PASS_MARK = 0.8
+_LEARNER_ID = re.compile(r'^[A-Za-z0-9_-]+$')
+_SQLITE_SYNCHRONOUS = {'none': 'OFF', 'batch': 'NORMAL', 'always': 'FULL'}
+_SQLITE_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS learners (
+    learner TEXT PRIMARY KEY,
+    scheduler TEXT NOT NULL,
+    seed INTEGER
+);
+CREATE TABLE IF NOT EXISTS progress (
+    learner TEXT NOT NULL,
+    question INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    incorrect INTEGER NOT NULL,
+    ease REAL,
+    interval REAL,
+    reps INTEGER,
+    due REAL,
+    hash BLOB,
+    PRIMARY KEY (learner, question)
+);
+CREATE INDEX IF NOT EXISTS progress_due ON progress (learner, due);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+'''
+_CATALOGUE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'questions.bin')
+_CATALOGUE_HEADER = struct.Struct('<4sII')
+_CATALOGUE_MAGIC = b'BZFQ'
+_CATALOGUE_VERSION = 3
+_CATALOGUE_OFFSET = struct.Struct('<I')
+_CATALOGUE_HASH_SIZE = 8
+_CATALOGUE_SECTION = struct.Struct('<H')
+_QUESTION_NUMBER = re.compile(r'\d+\s+')
+_LETTERS = ['A', 'B', 'C', 'D']
+_SEARCH_INDEX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'search-index.json')
+_SEARCH_TOKEN = re.compile(r'[^\W_]+(?:-[^\W_]+)*')
+_SEARCH_ABBREVIATION_DOT = re.compile(r'(?<=[^\W\d_])\.(?=[^\W\d_])')
+_SEARCH_UMLAUTS = str.maketrans({'ä': 'ae', 'ö': 'oe', 'ü': 'ue'})
+_SEARCH_STOPWORDS = frozenset('''
+    der die das den dem des ein eine einer einem einen eines und oder ist sind wird werden wurde zu zur zum
+    im in an am auf mit von fuer bei aus als wie was wer wo welche welcher welches nicht nur auch es sich sie
+    er dass durch ueber unter nach vor bis so muss darf kann soll
+'''.split())
 
 
 def main():
-    state = _load_or_init_state()
-    while True:
-        _ask_question(_pick_question(state), state)
-        _save_state(state)
-
-
-def _load_or_init_state():
-    if os.path.isfile(_STATE_FILE):
-        with open(_STATE_FILE) as f:
-            return json.load(f)
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--catalogue', action='append',
+        help='question file to use instead of the built-in BZF catalogue; repeat to merge several')
+    parser.set_defaults(
+        func=_train, scheduler=None, session=None, sections=None, durability='batch', database=None, codec='json',
+        vectorized=False, seed=None)
+    subparsers = parser.add_subparsers()
+
+    train_parser = subparsers.add_parser('train', help='drill questions (default)')
+    train_parser.add_argument('--scheduler', choices=sorted(_SCHEDULERS))
+    train_parser.add_argument('--vectorized', action='store_true', help='pick questions with NumPy')
+    train_parser.add_argument('--session', type=int, metavar='N', help='stop after N questions')
+    train_parser.add_argument(
+        '--sections', type=int, nargs='+', metavar='N', help='only drill these sections (numbered as in stats)')
+    train_parser.add_argument('--durability', choices=_DURABILITY, default='batch')
+    train_parser.add_argument('--codec', choices=sorted(_CODECS), default='json')
+    train_parser.add_argument('--database', help='keep progress in this SQLite database')
+    train_parser.add_argument('--learner', default='default', help='learner id in the database')
+    train_parser.add_argument(
+        '--seed', help='replay the session that printed this seed from its starting snapshot, without saving progress')
+    train_parser.set_defaults(func=_train)
+
+    compile_parser = subparsers.add_parser('compile', help='compile the question catalogue')
+    compile_parser.add_argument('--output')
+    compile_parser.set_defaults(func=_compile)
+
+    stats_parser = subparsers.add_parser('stats', help='show totals per section')
+    stats_parser.add_argument('--database', help='read progress from this SQLite database')
+    stats_parser.add_argument('--learner', default='default', help='learner id in the database')
+    stats_parser.set_defaults(func=_show_stats)
+
+    search_parser = subparsers.add_parser('search', help='find questions and show your progress on them')
+    search_parser.add_argument('query', nargs='+')
+    search_parser.add_argument('--limit', type=int, default=20)
+    search_parser.add_argument('--database', help='read progress from this SQLite database')
+    search_parser.add_argument('--learner', default='default', help='learner id in the database')
+    search_parser.set_defaults(func=_show_search)
+
+    serve_parser = subparsers.add_parser('serve', help='run the multi-learner HTTP server')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8080)
+    serve_parser.add_argument('--data-dir', default='learners', help='learner states and answer logs')
+    serve_parser.add_argument('--cache-size', type=int, default=1000)
+    serve_parser.add_argument('--flush-interval', type=float, default=5)
+    serve_parser.add_argument('--durability', choices=_DURABILITY, default='batch')
+    serve_parser.add_argument('--codec', choices=sorted(_CODECS), default='json')
+    serve_parser.add_argument('--database', help='keep progress in this SQLite database instead of --data-dir')
+    serve_parser.add_argument('--vectorized', action='store_true', help='pick questions with NumPy')
+    serve_parser.set_defaults(func=_serve)
+
+    exam_parser = subparsers.add_parser('exam', help='take a timed mock exam')
+    exam_parser.add_argument('--questions', type=int, default=_EXAM_SIZE)
+    exam_parser.add_argument('--time-limit', type=float, default=_EXAM_MINUTES, help='minutes')
+    exam_parser.add_argument('--pass-mark', type=float, default=_EXAM_PASS_MARK)
+    exam_parser.add_argument('--seed', help='draw and shuffle the exam with this seed')
+    exam_parser.set_defaults(func=_exam)
+
+    report_parser = subparsers.add_parser('report', help='analyse logged answers per question')
+    report_parser.add_argument('logs', nargs='*', default=[_EVENTS_FILE])
+    report_parser.add_argument('--limit', type=int, default=20, help='show the N hardest questions')
+    report_parser.add_argument('--min-attempts', type=int, default=5)
+    report_parser.set_defaults(func=_report)
+
+    dashboard_parser = subparsers.add_parser('dashboard', help='show school-wide statistics across learners')
+    dashboard_parser.add_argument('--data-dir', default='learners')
+    dashboard_parser.add_argument('--database', help='read learners from this SQLite database instead of --data-dir')
+    dashboard_parser.add_argument('--rebuild', action='store_true', help='recompute the rollups from learner states')
+    dashboard_parser.add_argument('--limit', type=int, default=10)
+    dashboard_parser.add_argument('--min-attempts', type=int, default=5)
+    dashboard_parser.set_defaults(func=_dashboard)
+
+    bench_parser = subparsers.add_parser('bench', help='benchmark selection, answer recording and persistence')
+    bench_parser.add_argument('--sizes', type=int, nargs='+', default=[260, 10000, 1000000])
+    bench_parser.add_argument('--turns', type=int, default=1000)
+    bench_parser.add_argument('--seed', type=int, default=0)
+    bench_parser.add_argument('--output', help='write the results to this JSON file')
+    bench_parser.set_defaults(func=_bench)
+
+    simulate_parser = subparsers.add_parser('simulate', help='compare schedulers on synthetic learners')
+    simulate_parser.add_argument('--schedulers', nargs='+', choices=sorted(_SCHEDULERS), default=sorted(_SCHEDULERS))
+    simulate_parser.add_argument('--vectorized', action='store_true', help='pick questions with NumPy')
+    simulate_parser.add_argument('--learners', type=int, default=100)
+    simulate_parser.add_argument('--budget', type=int, default=2000, help='questions per learner')
+    simulate_parser.add_argument('--questions-per-day', type=int, default=100)
+    simulate_parser.add_argument('--seconds-per-question', type=float, default=30)
+    simulate_parser.add_argument('--initial-stability', type=float, default=3, help='days')
+    simulate_parser.add_argument('--stability-growth', type=float, default=3)
+    simulate_parser.add_argument('--exam-size', type=int, default=_EXAM_SIZE)
+    simulate_parser.add_argument('--pass-mark', type=float, default=_EXAM_PASS_MARK)
+    simulate_parser.add_argument('--exams', type=int, default=1000, help='simulated exams per learner')
+    simulate_parser.add_argument('--processes', type=int)
+    simulate_parser.add_argument('--seed', type=int, default=0)
+    simulate_parser.add_argument('--output', help='write the results to this JSON file')
+    simulate_parser.set_defaults(func=_simulate)
+
+    args = parser.parse_args()
+    if args.vectorized and numpy is None:
+        parser.error('--vectorized requires NumPy')
+    if args.catalogue and args.func is not _compile:
+        try:
+            _set_catalogue(_load_catalogue(args.catalogue))
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+    args.func(args)
+
+
+def _train(args):
+    if args.seed:
+        _replay_session(args)
+        return
+
+    if args.database:
+        storage = _SqliteStorage(args.database, args.durability)
+        state = storage.load(args.learner)
     else:
-        return _init_state()
+        state = _load_local_state()
+        journal = _Journal(_JOURNAL_FILE, state, args.durability)
+    switched = args.scheduler is not None and args.scheduler != state['scheduler']
+    if args.scheduler:
+        state['scheduler'] = args.scheduler
+        _SCHEDULERS[args.scheduler].prepare(state)
+    if args.database:
+        storage.save(args.learner, state)
+    elif switched or not os.path.isfile(_STATE_FILE):
+        _save_state(state, durability=args.durability, codec=args.codec)
+        journal.reset(state)
+    seed = _session_seed(state)
+    print('Session seed: {}'.format(seed))
+    candidates = _section_candidates(args.sections)
+    _save_session(seed, state, {'sections': args.sections, 'vectorized': args.vectorized, 'length': args.session})
+    rng = random.Random(seed)
+    scheduler = _make_scheduler(state, args.vectorized, candidates, rng)
+
+    def persist(index, correct, timestamp):
+        if args.database:
+            storage.save(args.learner, state, [index])
+        else:
+            journal.append(index, correct, timestamp)
+            if journal.records >= _COMPACT_EVERY:
+                _save_state(state, durability=args.durability, codec=args.codec)
+                journal.reset(state)
+
+    questions = scheduler.pick_many(args.session) if args.session else iter(scheduler.pick, None)
+    events = _EventLog(_EVENTS_FILE)
+    answered, answered_correctly = _drill(
+        state, scheduler, _TerminalFrontend(), questions, persist, events=events, rng=rng)
+    events.close()
+    print('Session finished: {} of {} correct'.format(answered_correctly, answered))
+
+
+def _session_path(seed):
+    return os.path.join(_SESSIONS_DIR, seed.replace(':', '-') + '.state')
+
+
+def _save_session(seed, state, options):
+    os.makedirs(_SESSIONS_DIR, exist_ok=True)
+    state = _store_hashes(dict(state, session=options), _HASH_TABLES_DIR, 'none')
+    _write_file(_session_path(seed), _encode_state(state), 'none')
+    snapshots = sorted(
+        (os.path.join(_SESSIONS_DIR, name) for name in os.listdir(_SESSIONS_DIR) if name.endswith('.state')),
+        key=os.path.getmtime, reverse=True)
+    for path in snapshots[_SESSIONS_KEPT:]:
+        os.remove(path)
+
+
+def _replay_session(args):
+    try:
+        with open(_session_path(args.seed), 'rb') as f:
+            state = _migrate_state(_load_hashes(_decode_state(f.read()), _HASH_TABLES_DIR))
+    except (OSError, ValueError) as e:
+        sys.exit('Cannot replay session {}: {}'.format(args.seed, e))
+    options = state.pop('session')
+    if options['vectorized'] and numpy is None:
+        sys.exit('Session {} was drilled with --vectorized, which requires NumPy'.format(args.seed))
+
+    print('Replaying session {}, progress is not saved'.format(args.seed))
+    rng = random.Random(args.seed)
+    scheduler = _make_scheduler(state, options['vectorized'], _section_candidates(options['sections']), rng)
+    length = args.session or options['length']
+    questions = scheduler.pick_many(length) if length else iter(scheduler.pick, None)
+    answered, answered_correctly = _drill(state, scheduler, _TerminalFrontend(), questions, rng=rng)
+    print('Session finished: {} of {} correct'.format(answered_correctly, answered))
+
+
+def _section_candidates(sections):
+    if not sections:
+        return None
+    members = _get_section_members()
+    for section in sections:
+        if not 1 <= section <= len(members):
+            sys.exit('unknown section: {} (1-{})'.format(section, len(members)))
+    return list(heapq.merge(*(members[section - 1] for section in sorted(set(sections)))))
+
+
+def _drill(state, scheduler, frontend, questions, persist=None, clock=time.time, events=None, rng=random):
+    answered = 0
+    answered_correctly = 0
+    for index in questions:
+        correct = _ask_question(index, state, frontend, events, rng)
+        timestamp = clock()
+        _record_answer(state, index, correct, timestamp)
+        scheduler.update(index)
+        if persist is not None:
+            persist(index, correct, timestamp)
+        answered += 1
+        answered_correctly += correct
+    return answered, answered_correctly
+
+
+def _compile(args):
+    try:
+        _compile_catalogue(args.catalogue, args.output or _compiled_path(args.catalogue))
+    except ValueError as e:
+        sys.exit(str(e))
+
+
+def _load_progress(args):
+    if args.database:
+        return _SqliteStorage(args.database).load(args.learner)
+    state = _load_local_state()
+    _replay_journal(_JOURNAL_FILE, state)
+    return state
 
 
-def _save_state(state):
-    with open(_STATE_FILE, 'w') as f:
-        json.dump(state, f)
+def _load_local_state():
+    try:
+        return _load_or_init_state()
+    except ValueError:
+        sys.exit('Cannot load {} or its backup; restore one of them or move both away to start over'.format(
+            os.path.abspath(_STATE_FILE)))
+
+
+def _show_stats(args):
+    state = _load_progress(args)
+    totals = _get_totals(state)
+    print('total correct: {}, total incorrect: {}'.format(totals['correct'], totals['incorrect']))
+    for number, section in enumerate(_get_section_totals(state), 1):
+        print('{}. {name}: correct: {correct}, incorrect: {incorrect}'.format(number, **section))
+
+
+def _show_search(args):
+    results = _get_search_index().search(' '.join(args.query))
+    if not results:
+        print('No matching questions')
+        return
+
+    state = _load_progress(args)
+    for index in results[:args.limit]:
+        question = _get_catalogue()[index]
+        print(question['text'])
+        print('  {}'.format(question['answers'][0]['text']))
+        print('  (correct: {}, incorrect: {})'.format(state['correct'][index], state['incorrect'][index]))
+    if len(results) > args.limit:
+        print('... and {} more'.format(len(results) - args.limit))
+
+
+def _load_or_init_state(path=_STATE_FILE, tables_dir=None):
+    tables_dir = tables_dir or os.path.join(os.path.dirname(path), _HASH_TABLES_DIR)
+    error = None
+    for candidate in [path, path + '.bak']:
+        if not os.path.isfile(candidate):
+            continue
+        try:
+            with open(candidate, 'rb') as f:
+                return _migrate_state(_load_hashes(_decode_state(f.read()), tables_dir))
+        except ValueError as e:
+            print('Cannot load {}: {}'.format(candidate, e), file=sys.stderr)
+            error = error or e
+
+    if error is not None:
+        raise error
+    return _init_state()
+
+
+def _migrate_state(state):
+    if 'q' in state:
+        state = {
+            'version': _STATE_VERSION,
+            'generation': state.get('generation', 0),
+            'correct': [q['correct'] for q in state['q']],
+            'incorrect': [q['incorrect'] for q in state['q']],
+        }
+    assert state['version'] == _STATE_VERSION, state['version']
+
+    if 'seed' not in state:
+        counters = [state.get('generation', 0), state['correct'], state['incorrect']]
+        digest = hashlib.sha256(json.dumps(counters).encode('utf-8')).digest()
+        state['seed'] = int.from_bytes(digest[:8], 'little') >> 1
+    _remap_state(state)
+    state['totals'] = _compute_totals(state['correct'], state['incorrect'])
+    _SCHEDULERS[state.setdefault('scheduler', 'classic')].prepare(state)
 
+    return state
 
-def _pick_question(state):
-    questions = list(state['q'])
-    random.shuffle(questions)
-    best = questions[0]
 
-    if random.random() < 0.25:
-        get_priority = lambda q: (
-            q['correct'] - q['incorrect'],
-            q['correct'] + q['incorrect']
-        )
+def _remap_state(state):
+    hashes = _get_question_hashes()
+    old_hashes = state.get('hashes')
+    if old_hashes != hashes:
+        if old_hashes is None:
+            old_hashes = hashes[:len(state['correct'])]
+        old_index = {digest: index for index, digest in enumerate(old_hashes)}
+        mapping = [old_index.get(digest) for digest in hashes]
+        for columns, defaults in [(state, {'correct': 0, 'incorrect': 0}), (state.get('sm2', {}), _SM2_DEFAULTS)]:
+            for name, default in defaults.items():
+                if name in columns:
+                    column = columns[name]
+                    columns[name] = [default if index is None else column[index] for index in mapping]
+
+        if 'hashes' in state:
+            kept = len(mapping) - mapping.count(None)
+            print('Catalogue changed: kept progress on {} questions, {} new or changed, {} removed'.format(
+                kept, len(hashes) - kept, len(old_hashes) - kept), file=sys.stderr)
+    state['hashes'] = hashes
+
+
+def _compute_totals(correct, incorrect):
+    sections = _get_sections()
+    totals = {
+        'correct': sum(correct),
+        'incorrect': sum(incorrect),
+        'section_correct': [0] * len(_get_section_names()),
+        'section_incorrect': [0] * len(_get_section_names()),
+    }
+    for index, section in enumerate(sections):
+        totals['section_correct'][section] += correct[index]
+        totals['section_incorrect'][section] += incorrect[index]
+    return totals
+
+
+def _record_answer(state, index, correct, timestamp):
+    outcome = 'correct' if correct else 'incorrect'
+    state[outcome][index] += 1
+    state['totals'][outcome] += 1
+    state['totals']['section_' + outcome][_get_sections()[index]] += 1
+    _SCHEDULERS[state['scheduler']].record(state, index, correct, timestamp)
+
+
+def _check_answers(answers):
+    if not isinstance(answers, list) or not all(isinstance(answer, dict) for answer in answers):
+        raise ValueError('answers must be a list of JSON objects')
+    records = []
+    results = []
+    for answer in answers:
+        index = _check_question_id(answer['id'])
+        correct, correct_letter = _check_answer(answer['permutation'], answer['answer'])
+        records.append((_check_timestamp(answer['timestamp']), index, correct))
+        results.append({'id': index, 'correct': correct, 'correct_letter': correct_letter})
+    return records, results
+
+
+def _apply_answers(state, records):
+    for timestamp, index, correct in sorted(records, key=lambda record: record[0]):
+        _record_answer(state, index, correct, timestamp)
+
+
+def _get_totals(state):
+    return {'correct': state['totals']['correct'], 'incorrect': state['totals']['incorrect']}
+
+
+def _get_section_totals(state):
+    return [
+        {'name': name, 'correct': correct, 'incorrect': incorrect}
+        for name, correct, incorrect in zip(
+            _get_section_names(), state['totals']['section_correct'], state['totals']['section_incorrect'])
+    ]
+
+
+def _save_state(state, path=_STATE_FILE, durability='batch', codec='json', tables_dir=None):
+    state['generation'] = state.get('generation', 0) + 1
+    if os.path.isfile(path):
+        os.replace(path, path + '.bak')
+    tables_dir = tables_dir or os.path.join(os.path.dirname(path), _HASH_TABLES_DIR)
+    _write_file(path, _encode_state(_store_hashes(state, tables_dir, durability), codec), durability)
+
+
+def _store_hashes(state, tables_dir, durability='batch'):
+    hashes = state['hashes']
+    if hashes is _get_question_hashes():
+        digest = _get_question_hashes_digest()
     else:
-        get_priority = lambda q: q['correct'] + q['incorrect']
+        digest = _hashes_digest(hashes)
+    path = os.path.join(tables_dir, digest + '.hashes')
+    if not os.path.isfile(path):
+        os.makedirs(tables_dir, exist_ok=True)
+        _write_file(path, bytes.fromhex(''.join(hashes)), durability)
+
+    state = dict(state, catalogue=digest)
+    del state['hashes']
+    return state
 
-    for question in state['q']:
-        if get_priority(question) < get_priority(best):
-            best = question
 
-    return best
-            
+def _load_hashes(state, tables_dir):
+    digest = state.pop('catalogue', None)
+    if digest is None:
+        return state
+    if digest == _get_question_hashes_digest():
+        state['hashes'] = _get_question_hashes()
+        return state
+
+    try:
+        with open(os.path.join(tables_dir, digest + '.hashes'), 'rb') as f:
+            table = f.read().hex()
+    except OSError as e:
+        print('Cannot load question hashes, matching questions by position: {}'.format(e), file=sys.stderr)
+        return state
+    size = _CATALOGUE_HASH_SIZE * 2
+    state['hashes'] = [table[position:position + size] for position in range(0, len(table), size)]
+    return state
 
-def _ask_question(question, state):
-    print('(correct: {}, incorrect: {}, total correct: {}, total incorrect: {})'.format(
-        question['correct'],
-        question['incorrect'],
-        sum(q['correct'] for q in state['q']),
-        sum(q['incorrect'] for q in state['q']),
-    ))
 
-    print(question['text'])
-    print()
+def _hashes_digest(hashes):
+    return hashlib.sha256(''.join(hashes).encode('ascii')).hexdigest()[:32]
+
+
+def _encode_state(state, codec='json'):
+    codec_id, encode = _CODECS[codec]
+    payload = encode(state)
+    return _STATE_HEADER.pack(_STATE_MAGIC, codec_id, hashlib.sha256(payload).digest()) + payload
+
+
+def _decode_state(data):
+    if data[:1] == b'{':
+        return json.loads(data)
+
+    if len(data) < _STATE_HEADER.size:
+        raise ValueError('truncated state file')
+    magic, codec_id, digest = _STATE_HEADER.unpack_from(data)
+    if magic != _STATE_MAGIC:
+        raise ValueError('unknown state format')
+    decode = _DECODERS.get(codec_id)
+    if decode is None:
+        raise ValueError('unsupported state codec: {!r}'.format(codec_id))
+    payload = data[_STATE_HEADER.size:]
+    if hashlib.sha256(payload).digest() != digest:
+        raise ValueError('checksum mismatch')
+    return decode(payload)
+
+
+def _encode_json(state):
+    if orjson is not None:
+        return orjson.dumps(state)
+    return json.dumps(state, separators=(',', ':')).encode('utf-8')
+
+
+def _decode_json(payload):
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def _encode_packed(state):
+    columns = [['correct'], ['incorrect']] + [['sm2', name] for name in sorted(state.get('sm2', {}))]
+    meta = {key: value for key, value in state.items() if key not in ('correct', 'incorrect', 'sm2', 'totals')}
+    meta['count'] = len(state['correct'])
+    meta['columns'] = []
+    arrays = []
+    for path in columns:
+        values = functools.reduce(lambda value, key: value[key], path, state)
+        column = _pack_column(values)
+        if sys.byteorder != 'little':
+            column.byteswap()
+        meta['columns'].append([path, column.typecode])
+        arrays.append(column.tobytes())
+
+    meta = json.dumps(meta, separators=(',', ':')).encode('utf-8')
+    return _PACKED_LENGTH.pack(len(meta)) + meta + b''.join(arrays)
+
+
+def _pack_column(values):
+    try:
+        column = array.array('q', values)
+    except TypeError:
+        return array.array('d', values)
+
+    low = min(column, default=0)
+    high = max(column, default=0)
+    for typecode, minimum, maximum in [('B', 0, 2 ** 8), ('H', 0, 2 ** 16), ('i', -2 ** 31, 2 ** 31)]:
+        if minimum <= low and high < maximum:
+            return array.array(typecode, column)
+    return column
+
+
+def _decode_packed(payload):
+    length, = _PACKED_LENGTH.unpack_from(payload)
+    position = _PACKED_LENGTH.size + length
+    state = json.loads(payload[_PACKED_LENGTH.size:position])
+    count = state.pop('count')
+    for path, typecode in state.pop('columns'):
+        column = array.array(typecode)
+        end = position + column.itemsize * count
+        if end > len(payload):
+            raise ValueError('truncated column: {}'.format('.'.join(path)))
+        column.frombytes(payload[position:end])
+        if sys.byteorder != 'little':
+            column.byteswap()
+        position = end
+
+        target = state
+        for key in path[:-1]:
+            target = target.setdefault(key, {})
+        target[path[-1]] = column.tolist()
+    return state
 
-    letters = [answer['letter'] for answer in question['answers']]
-    answers = list(question['answers'])
-    correct_answer = answers[0]
-    random.shuffle(answers)
 
-    for letter, answer in zip(letters, answers):
-        print('{} {}'.format(letter, answer['text']))
-        if answer is correct_answer:
-            correct_letter = letter
+_CODECS = {
+    'json': (b'j', _encode_json),
+    'packed': (b'p', _encode_packed),
+}
+_DECODERS = {
+    b'j': _decode_json,
+    b'p': _decode_packed,
+}
+if msgpack is not None:
+    _CODECS['msgpack'] = (b'm', msgpack.packb)
+    _DECODERS[b'm'] = msgpack.unpackb
+
+
+def _write_file(path, data, durability):
+    parent = os.path.dirname(os.path.abspath(path))
+    fd, temp_file = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=parent)
+    try:
+        with open(fd, 'wb') as f:
+            f.write(data)
+            if durability != 'none':
+                f.flush()
+                os.fsync(f.fileno())
+        os.chmod(temp_file, 0o644)
+        os.replace(temp_file, path)
+    except BaseException:
+        os.remove(temp_file)
+        raise
+
+    if durability != 'none' and hasattr(os, 'O_DIRECTORY'):
+        directory = os.open(parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+
+class _FileStorage:
+    def __init__(self, data_dir, durability='batch', codec='json'):
+        self._data_dir = data_dir
+        self._durability = durability
+        self._codec = codec
+        self.identity = 'files:' + os.path.abspath(data_dir)
+
+    def _path(self, learner_id):
+        return os.path.join(self._data_dir, learner_id, _STATE_FILE)
+
+    def learners(self):
+        if not os.path.isdir(self._data_dir):
+            return []
+        return sorted(
+            learner_id for learner_id in os.listdir(self._data_dir)
+            if _LEARNER_ID.match(learner_id) and os.path.isfile(self._path(learner_id)))
+
+    def load(self, learner_id):
+        return _load_or_init_state(self._path(learner_id), os.path.join(self._data_dir, _HASH_TABLES_DIR))
+
+    def revision(self):
+        digest = hashlib.sha256()
+        for learner_id in self.learners():
+            stat = os.stat(self._path(learner_id))
+            digest.update('{}:{}:{}\n'.format(learner_id, stat.st_mtime_ns, stat.st_size).encode('utf-8'))
+        return digest.hexdigest()[:32]
+
+    def save(self, learner_id, state, indices=None):
+        path = self._path(learner_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _save_state(state, path, self._durability, self._codec, os.path.join(self._data_dir, _HASH_TABLES_DIR))
+
+
+class _SqliteStorage:
+    def __init__(self, path, durability='batch'):
+        self.identity = 'sqlite:' + os.path.abspath(path)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        self._connection.execute('PRAGMA synchronous = {}'.format(_SQLITE_SYNCHRONOUS[durability]))
+        with self._connection:
+            self._connection.executescript(_SQLITE_SCHEMA)
+            columns = [row[1] for row in self._connection.execute('PRAGMA table_info(progress)')]
+            if 'hash' not in columns:
+                self._connection.execute('ALTER TABLE progress ADD COLUMN hash BLOB')
+            columns = [row[1] for row in self._connection.execute('PRAGMA table_info(learners)')]
+            if 'seed' not in columns:
+                self._connection.execute('ALTER TABLE learners ADD COLUMN seed INTEGER')
+
+    def learners(self):
+        return [row[0] for row in self._connection.execute('SELECT learner FROM learners ORDER BY learner')]
+
+    def revision(self):
+        row = self._connection.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()
+        return 0 if row is None else row[0]
+
+    def load(self, learner_id):
+        state = _init_state()
+        row = self._connection.execute(
+            'SELECT scheduler, seed FROM learners WHERE learner = ?', (learner_id,)).fetchone()
+        if row is None:
+            return state
+
+        state['scheduler'] = row[0]
+        if row[1] is not None:
+            state['seed'] = row[1]
+        _SCHEDULERS[state['scheduler']].prepare(state)
+        question_index = _get_question_index()
+        moved = False
+        rows = self._connection.execute(
+            'SELECT question, correct, incorrect, ease, interval, reps, due, hash FROM progress '
+            'WHERE learner = ?', (learner_id,))
+        for question, correct, incorrect, ease, interval, reps, due, digest in rows:
+            index = question if digest is None else question_index.get(digest.hex())
+            moved = moved or index != question or digest is None
+            if index is None or index >= len(state['correct']):
+                continue
+            state['correct'][index] = correct
+            state['incorrect'][index] = incorrect
+            if 'sm2' in state and ease is not None:
+                state['sm2']['ease'][index] = ease
+                state['sm2']['interval'][index] = interval
+                state['sm2']['reps'][index] = reps
+                state['sm2']['due'][index] = due
+        state['totals'] = _compute_totals(state['correct'], state['incorrect'])
+        if moved:
+            self.save(learner_id, state)
+        return state
+
+    def save(self, learner_id, state, indices=None):
+        sm2 = state.get('sm2')
+        rows = [
+            (
+                learner_id, index, state['correct'][index], state['incorrect'][index],
+                sm2 and sm2['ease'][index], sm2 and sm2['interval'][index],
+                sm2 and sm2['reps'][index], sm2 and sm2['due'][index],
+                bytes.fromhex(state['hashes'][index]),
+            )
+            for index in (range(len(state['correct'])) if indices is None else indices)
+        ]
+        with self._connection:
+            if indices is None:
+                self._connection.execute('DELETE FROM progress WHERE learner = ?', (learner_id,))
+            self._connection.execute(
+                'INSERT OR REPLACE INTO learners (learner, scheduler, seed) VALUES (?, ?, ?)',
+                (learner_id, state['scheduler'], state['seed']))
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO progress '
+                '(learner, question, correct, incorrect, ease, interval, reps, due, hash) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            self._connection.execute(
+                "INSERT INTO meta (key, value) VALUES ('revision', 1) "
+                'ON CONFLICT (key) DO UPDATE SET value = value + 1')
+
+
+class _Journal:
+    def __init__(self, path, state, durability='batch'):
+        self._path = path
+        self._durability = durability
+        magic, answers, records = _replay_journal(path, state)
+        if magic == _JOURNAL_MAGIC:
+            os.truncate(path, _JOURNAL_HEADER.size + records * _JOURNAL_RECORD.size)
+            self._file = open(path, 'ab')
+            self.records = records
+        else:
+            self._rewrite(state, answers)
+
+    def _rewrite(self, state, answers):
+        if hasattr(self, '_file'):
+            self._file.close()
+        header = _JOURNAL_HEADER.pack(_JOURNAL_MAGIC, state.get('generation', 0))
+        _write_file(self._path, header + b''.join(map(self._pack, answers)), self._durability)
+        self._file = open(self._path, 'ab')
+        self.records = len(answers)
+
+    @staticmethod
+    def _pack(answer):
+        index, correct, timestamp = answer
+        return _JOURNAL_RECORD.pack(bytes.fromhex(_get_question_hashes()[index]), correct, timestamp)
+
+    def append(self, index, correct, timestamp):
+        self._file.write(self._pack((index, correct, timestamp)))
+        self._file.flush()
+        self.records += 1
+        if self._durability == 'always' or \
+                self._durability == 'batch' and self.records % _FSYNC_BATCH == 0:
+            os.fsync(self._file.fileno())
+
+    def reset(self, state):
+        self._rewrite(state, [])
+
+
+def _replay_journal(path, state):
+    answers = []
+    records = 0
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return None, answers, records
+
+    with f:
+        header = f.read(_JOURNAL_HEADER.size)
+        if len(header) < _JOURNAL_HEADER.size:
+            return None, answers, records
+        magic, generation = _JOURNAL_HEADER.unpack(header)
+        if generation != state.get('generation', 0):
+            return None, answers, records
+        if magic == _JOURNAL_MAGIC:
+            record_format = _JOURNAL_RECORD
+        elif magic == _JOURNAL_LEGACY_MAGIC:
+            record_format = _JOURNAL_LEGACY_RECORD
+        else:
+            return None, answers, records
+
+        question_index = _get_question_index()
+        while True:
+            record = f.read(record_format.size)
+            if len(record) < record_format.size:
+                break
+            records += 1
+            index, correct, timestamp = record_format.unpack(record)
+            if magic == _JOURNAL_MAGIC:
+                index = question_index.get(index.hex())
+            if index is not None and index < len(question_index):
+                answers.append((index, correct, timestamp))
+
+    for answer in answers:
+        _record_answer(state, *answer)
+    return magic, answers, records
+
+
+class _EventLog:
+    def __init__(self, path):
+        self._path = path
+        self._file = None
+
+    def _open(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self._path)), exist_ok=True)
+        self._file = open(self._path, 'a+b')
+        self._file.seek(0)
+        magic = self._file.read(len(_EVENTS_MAGIC))
+        if not magic:
+            self._file.write(_EVENTS_MAGIC)
+        elif magic != _EVENTS_MAGIC:
+            raise ValueError('{}: not an answer log'.format(self._path))
+        else:
+            size = self._file.seek(0, os.SEEK_END) - len(_EVENTS_MAGIC)
+            self._file.truncate(len(_EVENTS_MAGIC) + size - size % _EVENT_RECORD.size)
+
+    @staticmethod
+    def pack(index, permutation, letter, shown, answered):
+        latency = answered - shown if shown is not None else math.nan
+        packed = sum(answer << 2 * position for position, answer in enumerate(permutation))
+        try:
+            return _EVENT_RECORD.pack(
+                bytes.fromhex(_get_question_hashes()[index]), packed, _LETTERS.index(letter), shown or answered, latency)
+        except (OverflowError, struct.error):
+            raise ValueError('invalid shown time: {}'.format(shown))
+
+    def append(self, index, permutation, letter, shown, answered):
+        self.write(self.pack(index, permutation, letter, shown, answered))
+
+    def write(self, record):
+        if self._file is None:
+            self._open()
+        self._file.write(record)
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _read_events(path):
+    with open(path, 'rb') as f:
+        if f.read(len(_EVENTS_MAGIC)) != _EVENTS_MAGIC:
+            raise ValueError('{}: not an answer log'.format(path))
+        while True:
+            chunk = f.read(_EVENT_RECORD.size * 4096)
+            chunk = chunk[:len(chunk) - len(chunk) % _EVENT_RECORD.size]
+            if not chunk:
+                return
+            yield from _EVENT_RECORD.iter_unpack(chunk)
+
+
+class _CountScheduler:
+    @staticmethod
+    def prepare(state):
+        pass
+
+    @staticmethod
+    def record(state, index, correct, timestamp):
+        pass
+
+    def __init__(self, state, candidates=None, rng=random):
+        self._correct = state['correct']
+        self._incorrect = state['incorrect']
+        self._random = rng
+        self._count = len(self._correct) if candidates is None else len(candidates)
+        keys = [self._keys(index) for index in (range(len(self._correct)) if candidates is None else candidates)]
+        self._balance = _IndexedHeap([balance for balance, _ in keys], candidates)
+        self._attempts = _IndexedHeap([attempts for _, attempts in keys], candidates)
+
+    def _keys(self, index):
+        correct = self._correct[index]
+        incorrect = self._incorrect[index]
+        tiebreak = self._random.random()
+        return (correct - incorrect, correct + incorrect, tiebreak), (correct + incorrect, tiebreak)
+
+    def pick(self):
+        heap = self._balance if self._random.random() < 0.25 else self._attempts
+        return heap.peek()
+
+    def pick_many(self, count):
+        balance = iter(self._balance.smallest(count))
+        attempts = iter(self._attempts.smallest(count))
+        picked = set()
+        while len(picked) < min(count, self._count):
+            candidates = balance if self._random.random() < 0.25 else attempts
+            index = next(index for index in candidates if index not in picked)
+            picked.add(index)
+            yield index
+
+    def update(self, index):
+        balance, attempts = self._keys(index)
+        self._balance.update(index, balance)
+        self._attempts.update(index, attempts)
+
+
+class _Sm2Scheduler:
+    @staticmethod
+    def prepare(state):
+        count = len(state['correct'])
+        columns = state.setdefault('sm2', {})
+        for name, default in _SM2_DEFAULTS.items():
+            column = columns.setdefault(name, [])
+            column.extend([default] * (count - len(column)))
+
+    @staticmethod
+    def record(state, index, correct, timestamp):
+        columns = state['sm2']
+        quality = _SM2_QUALITY[bool(correct)]
+        ease = columns['ease'][index] + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+        columns['ease'][index] = max(_SM2_MINIMUM_EASE, ease)
+
+        if quality < 3:
+            columns['reps'][index] = 0
+            columns['interval'][index] = 0
+            columns['due'][index] = timestamp + _SM2_RELEARN_DELAY
+            return
+
+        columns['reps'][index] += 1
+        if columns['reps'][index] == 1:
+            interval = 1
+        elif columns['reps'][index] == 2:
+            interval = 6
+        else:
+            interval = columns['interval'][index] * columns['ease'][index]
+        columns['interval'][index] = interval
+        columns['due'][index] = timestamp + interval * _DAY
+
+    def __init__(self, state, candidates=None, rng=random):
+        self._due = state['sm2']['due']
+        self._random = rng
+        keys = [self._key(index) for index in (range(len(self._due)) if candidates is None else candidates)]
+        self._heap = _IndexedHeap(keys, candidates)
+
+    def _key(self, index):
+        return self._due[index], self._random.random()
+
+    def pick(self):
+        return self._heap.peek()
+
+    def pick_many(self, count):
+        yield from self._heap.smallest(count)
+
+    def update(self, index):
+        self._heap.update(index, self._key(index))
+
+
+class _VectorizedCountScheduler(_CountScheduler):
+    def __init__(self, state, candidates=None, rng=random):
+        self._correct = state['correct']
+        self._incorrect = state['incorrect']
+        self._random = rng
+        self._count = len(self._correct) if candidates is None else len(candidates)
+        correct = numpy.array(self._correct, dtype=numpy.int32)
+        incorrect = numpy.array(self._incorrect, dtype=numpy.int32)
+        if candidates is not None:
+            candidates = numpy.array(candidates, dtype=numpy.int64)
+            correct = correct[candidates]
+            incorrect = incorrect[candidates]
+        attempts = correct + incorrect
+        self._balance = _ArrayIndex(((correct - incorrect).astype(numpy.int64) << 32) + attempts, candidates, rng)
+        self._attempts = _ArrayIndex(attempts, candidates, rng)
+
+    def _keys(self, index):
+        correct = self._correct[index]
+        incorrect = self._incorrect[index]
+        return ((correct - incorrect) << 32) + correct + incorrect, correct + incorrect
+
+
+class _VectorizedSm2Scheduler(_Sm2Scheduler):
+    def __init__(self, state, candidates=None, rng=random):
+        self._due = state['sm2']['due']
+        due = numpy.array(self._due, dtype=numpy.float64)
+        if candidates is not None:
+            candidates = numpy.array(candidates, dtype=numpy.int64)
+            due = due[candidates]
+        self._heap = _ArrayIndex(due, candidates, rng)
+
+    def _key(self, index):
+        return self._due[index]
+
+
+class _ArrayIndex:
+    def __init__(self, keys, indices=None, rng=random):
+        self._keys = keys
+        self._indices = indices
+        self._random = rng
+
+    def peek(self):
+        candidates = numpy.flatnonzero(self._keys == self._keys.min())
+        return self._index(candidates[self._random.randrange(len(candidates))])
+
+    def update(self, index, key):
+        if self._indices is not None:
+            index = numpy.searchsorted(self._indices, index)
+        self._keys[index] = key
+
+    def _index(self, position):
+        return int(position if self._indices is None else self._indices[position])
+
+    def smallest(self, count):
+        count = min(count, len(self._keys))
+        if count == 0:
+            return []
+
+        generator = numpy.random.default_rng(self._random.getrandbits(64))
+        threshold = numpy.partition(self._keys, count - 1)[count - 1]
+        below = numpy.flatnonzero(self._keys < threshold)
+        tied = numpy.flatnonzero(self._keys == threshold)
+        chosen = numpy.concatenate([below, generator.choice(tied, count - len(below), replace=False)])
+        order = numpy.lexsort((generator.random(count), self._keys[chosen]))
+        chosen = chosen[order]
+        return (chosen if self._indices is None else self._indices[chosen]).tolist()
+
+
+_SCHEDULERS = {
+    'classic': _CountScheduler,
+    'sm2': _Sm2Scheduler,
+}
+_VECTORIZED_SCHEDULERS = {
+    'classic': _VectorizedCountScheduler,
+    'sm2': _VectorizedSm2Scheduler,
+}
+
+
+def _make_scheduler(state, vectorized=False, candidates=None, rng=random):
+    schedulers = _VECTORIZED_SCHEDULERS if vectorized else _SCHEDULERS
+    return schedulers[state['scheduler']](state, candidates, rng)
+
+
+def _session_seed(state):
+    return '{}:{}'.format(state['seed'], state['totals']['correct'] + state['totals']['incorrect'])
+
+
+class _IndexedHeap:
+    def __init__(self, keys, indices=None):
+        if indices is None:
+            indices = range(len(keys))
+        self._heap = list(zip(keys, indices))
+        heapq.heapify(self._heap)
+        self._positions = [0] * (max(indices, default=-1) + 1)
+        for position, (_, index) in enumerate(self._heap):
+            self._positions[index] = position
+
+    def peek(self):
+        return self._heap[0][1]
+
+    def smallest(self, count):
+        result = []
+        frontier = [(self._heap[0], 0)] if self._heap else []
+        while frontier and len(result) < count:
+            (_, index), position = heapq.heappop(frontier)
+            result.append(index)
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(self._heap):
+                    heapq.heappush(frontier, (self._heap[child], child))
+        return result
+
+    def update(self, index, key):
+        position = self._positions[index]
+        old_key = self._heap[position][0]
+        self._heap[position] = (key, index)
+        if key < old_key:
+            self._sift_up(position)
+        else:
+            self._sift_down(position)
+
+    def _sift_up(self, position):
+        entry = self._heap[position]
+        while position > 0:
+            parent = (position - 1) // 2
+            if self._heap[parent] <= entry:
+                break
+            self._place(self._heap[parent], position)
+            position = parent
+        self._place(entry, position)
+
+    def _sift_down(self, position):
+        entry = self._heap[position]
+        while True:
+            child = 2 * position + 1
+            if child >= len(self._heap):
+                break
+            if child + 1 < len(self._heap) and self._heap[child + 1] < self._heap[child]:
+                child += 1
+            if entry <= self._heap[child]:
+                break
+            self._place(self._heap[child], position)
+            position = child
+        self._place(entry, position)
+
+    def _place(self, entry, position):
+        self._heap[position] = entry
+        self._positions[entry[1]] = position
+
+
+def _ask_question(index, state, frontend, events=None, rng=random):
+    permutation = _shuffle_answers(rng)
+    shown = time.time()
+    letter = frontend.ask(index, state, permutation)
+    correct, correct_letter = _check_answer(permutation, letter)
+    if events is not None:
+        events.append(index, permutation, letter, shown, time.time())
+    frontend.tell(index, correct, correct_letter)
+    return correct
+
+
+class _TerminalFrontend:
+    def ask(self, index, state, permutation):
+        question = _get_catalogue()[index]
+        self._print_header(index, state)
+        print(question['text'])
+        print()
+
+        for letter, answer in zip(_LETTERS, permutation):
+            print('{} {}'.format(letter, question['answers'][answer]['text']))
+
+        print()
+
+        while True:
+            user_input = input('Answer: ').upper()
+            if user_input in _LETTERS:
+                return user_input
+
+    def _print_header(self, index, state):
+        print('(correct: {}, incorrect: {}, total correct: {}, total incorrect: {})'.format(
+            state['correct'][index],
+            state['incorrect'][index],
+            state['totals']['correct'],
+            state['totals']['incorrect'],
+        ))
+
+    def tell(self, index, correct, correct_letter):
+        if correct:
+            print('Correct!')
+        else:
+            print('Incorrect! The right answer was:')
+            print('{} {}'.format(correct_letter, _get_catalogue()[index]['answers'][0]['text']))
+
+        print()
+
+
+class _ExamFrontend(_TerminalFrontend):
+    def __init__(self, count, deadline):
+        self.number = 0
+        self._count = count
+        self._deadline = deadline
+
+    def expired(self):
+        return time.time() >= self._deadline
+
+    def _print_header(self, index, state):
+        remaining = max(0, int(self._deadline - time.time()))
+        print('(question {} of {}, {}:{:02} left)'.format(self.number, self._count, remaining // 60, remaining % 60))
+
+    def tell(self, index, correct, correct_letter):
+        print()
+
+
+class _ScriptedFrontend:
+    def __init__(self, choose, observe=None):
+        self._choose = choose
+        self._observe = observe
+
+    def ask(self, index, state, permutation):
+        return self._choose(index, permutation)
+
+    def tell(self, index, correct, correct_letter):
+        if self._observe is not None:
+            self._observe(index, correct)
+
+
+def _shuffle_answers(rng=random):
+    permutation = list(range(len(_LETTERS)))
+    rng.shuffle(permutation)
+    return permutation
+
+
+def _check_answer(permutation, letter):
+    if (not isinstance(permutation, list) or any(type(answer) is not int for answer in permutation)
+            or sorted(permutation) != list(range(len(_LETTERS)))):
+        raise ValueError('invalid permutation: {}'.format(permutation))
+    if letter not in _LETTERS:
+        raise ValueError('invalid answer: {}'.format(letter))
+    correct_letter = _LETTERS[permutation.index(0)]
+    return letter == correct_letter, correct_letter
+
+
+def _check_question_id(index):
+    if type(index) is not int or not 0 <= index < len(_get_catalogue()):
+        raise ValueError('invalid question id: {}'.format(index))
+    return index
+
+
+def _check_shown(request):
+    shown = request.get('shown')
+    return None if shown is None else _check_timestamp(shown)
+
+
+def _check_timestamp(timestamp):
+    timestamp = float(timestamp)
+    if not math.isfinite(timestamp):
+        raise ValueError('invalid timestamp: {}'.format(timestamp))
+    return timestamp
+
 
-    print()
-
-    while True:
-        user_input = input('Answer: ').upper()
-        if user_input in letters:
+def _question_payload(state, index, rng=random):
+    question = _get_catalogue()[index]
+    permutation = _shuffle_answers(rng)
+    return {
+        'id': index,
+        'text': question['text'],
+        'answers': [
+            {'letter': letter, 'text': question['answers'][answer]['text']}
+            for letter, answer in zip(_LETTERS, permutation)
+        ],
+        'permutation': permutation,
+        'shown': time.time(),
+        'correct': state['correct'][index],
+        'incorrect': state['incorrect'][index],
+    }
+
+
+def _exam(args):
+    rng = random.Random(args.seed)
+    questions = _sample_exam(args.questions, rng)
+    started = time.time()
+    frontend = _ExamFrontend(len(questions), started + args.time_limit * 60)
+    events = _EventLog(_EVENTS_FILE)
+    answers = []
+    for number, index in enumerate(questions, 1):
+        if frontend.expired():
             break
-    
-    if user_input == correct_letter:
-        print('Correct!')
-        question['correct'] += 1
-    else:
-        print('Incorrect! The right answer was:')
-        print('{} {}'.format(correct_letter, correct_answer['text']))
-        question['incorrect'] += 1
+        frontend.number = number
+        correct = _ask_question(index, None, frontend, events, rng)
+        answers.append(correct and not frontend.expired())
+    events.close()
+
+    sections = {}
+    outcomes = itertools.zip_longest(questions, answers, fillvalue=False)
+    for index, correct in sorted(outcomes, key=lambda outcome: _get_sections()[outcome[0]]):
+        name = _get_section_names()[_get_sections()[index]]
+        section = sections.setdefault(name, [0, 0])
+        section[0] += correct
+        section[1] += 1
+
+    score = sum(answers)
+    passed = score >= math.ceil(args.pass_mark * len(questions))
+    result = {
+        'timestamp': started,
+        'duration': time.time() - started,
+        'questions': questions,
+        'answers': answers,
+        'score': score,
+        'total': len(questions),
+        'passed': passed,
+        'sections': sections,
+    }
+    with open(_EXAMS_FILE, 'a') as f:
+        f.write(json.dumps(result) + '\n')
+
+    if len(answers) < len(questions):
+        print('Time is up!')
+    for name, (correct, total) in sections.items():
+        print('{}: {} of {}'.format(name, correct, total))
+    print('Score: {} of {}, {}'.format(score, len(questions), 'passed' if passed else 'failed'))
+
+
+def _sample_exam(size, rng=random):
+    by_section = dict(enumerate(_get_section_members()))
+    count = sum(len(indices) for indices in by_section.values())
+    size = min(size, count)
+
+    quotas = {section: size * len(indices) / count for section, indices in by_section.items()}
+    sizes = {section: int(quota) for section, quota in quotas.items()}
+    remainders = sorted(quotas, key=lambda section: quotas[section] - sizes[section], reverse=True)
+    for section in remainders[:size - sum(sizes.values())]:
+        sizes[section] += 1
+
+    questions = []
+    for section, indices in sorted(by_section.items()):
+        questions.extend(rng.sample(indices, sizes[section]))
+    rng.shuffle(questions)
+    return questions
+
+
+def _report(args):
+    questions = {}
+    events = 0
+    for path in args.logs:
+        try:
+            for digest, packed, position, shown, latency in _read_events(path):
+                question = questions.get(digest)
+                if question is None:
+                    question = questions[digest] = [0, [0] * len(_LETTERS), [0] * (len(_LATENCY_BUCKETS) + 1)]
+                question[0] += 1
+                question[1][packed >> 2 * position & 3] += 1
+                if not math.isnan(latency):
+                    question[2][bisect.bisect_left(_LATENCY_BUCKETS, latency)] += 1
+                events += 1
+        except (OSError, ValueError) as e:
+            sys.exit(str(e))
+
+    print('{} answers to {} questions'.format(events, len(questions)))
+    rows = []
+    question_index = _get_question_index()
+    for digest, (attempts, chosen, histogram) in questions.items():
+        if attempts >= args.min_attempts:
+            rows.append((1 - chosen[0] / attempts, attempts, question_index.get(digest.hex()), chosen, histogram))
+    rows.sort(key=lambda row: row[:2], reverse=True)
 
     print()
+    print('{:>5} {:>8} {:>6} {:>7} {:>7}  {}'.format('#', 'attempts', 'wrong', 'p50', 'p90', 'most chosen distractor'))
+    for error_rate, attempts, index, chosen, histogram in rows[:args.limit]:
+        distractor = max(range(1, len(_LETTERS)), key=lambda answer: chosen[answer])
+        if index is None or not chosen[distractor]:
+            distractor_text = '-'
+        else:
+            distractor_text = '{:.0%} {}'.format(
+                chosen[distractor] / (attempts - chosen[0]), _get_catalogue()[index]['answers'][distractor]['text'])
+        print('{:>5} {:>8} {:>6.0%} {:>7} {:>7}  {}'.format(
+            '-' if index is None else index + 1, attempts, error_rate,
+            _format_latency(_histogram_percentile(histogram, 0.5)),
+            _format_latency(_histogram_percentile(histogram, 0.9)), distractor_text))
+
+
+def _histogram_percentile(histogram, fraction):
+    total = sum(histogram)
+    if not total:
+        return None
+    for bucket, cumulative in enumerate(itertools.accumulate(histogram)):
+        if cumulative >= fraction * total:
+            return _LATENCY_BUCKETS[bucket] if bucket < len(_LATENCY_BUCKETS) else math.inf
+
+
+def _format_latency(seconds):
+    if seconds is None:
+        return '-'
+    if seconds == math.inf:
+        return '>{:.0f}s'.format(_LATENCY_BUCKETS[-1])
+    return '{:.1f}s'.format(seconds)
+
+
+def _bench(args):
+    results = {}
+    original_catalogue = _get_catalogue()
+    try:
+        for size in args.sizes:
+            print('Benchmarking {} questions'.format(size), file=sys.stderr)
+            _set_catalogue(_SyntheticCatalogue(size))
+            results[size] = _bench_size(args.turns, random.Random(args.seed))
+    finally:
+        _set_catalogue(original_catalogue)
+
+    report = json.dumps({
+        'python': sys.version.split()[0],
+        'timestamp': time.time(),
+        'turns': args.turns,
+        'seed': args.seed,
+        'results': results,
+    }, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+
+def _bench_size(turns, rng):
+    _get_question_hashes()
+    tracemalloc.start()
+    _init_state()
+    state_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    state = _init_state()
+    init_seconds = time.perf_counter() - started
+
+    schedulers = {}
+    variants = [(name, False) for name in sorted(_SCHEDULERS)]
+    if numpy is not None:
+        variants += [(name, True) for name in sorted(_VECTORIZED_SCHEDULERS)]
+    for name, vectorized in variants:
+        state['scheduler'] = name
+        _SCHEDULERS[name].prepare(state)
+        started = time.perf_counter()
+        scheduler = _make_scheduler(state, vectorized, rng=rng)
+        build_seconds = time.perf_counter() - started
+
+        timings = []
+        timestamp = time.time()
+        for turn in range(turns):
+            started = time.perf_counter()
+            index = scheduler.pick()
+            _record_answer(state, index, rng.random() < 0.7, timestamp + turn)
+            scheduler.update(index)
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        frontend = _ScriptedFrontend(lambda index, permutation: rng.choice(_LETTERS))
+        started = time.perf_counter()
+        _drill(state, scheduler, frontend, itertools.islice(iter(scheduler.pick, None), turns), rng=rng)
+        drill_seconds = time.perf_counter() - started
+
+        schedulers[name + ('-vectorized' if vectorized else '')] = {
+            'build_seconds': build_seconds,
+            'turn_mean_microseconds': 1e6 * sum(timings) / len(timings),
+            'turn_p99_microseconds': 1e6 * timings[int(0.99 * (len(timings) - 1))],
+            'drill_turns_per_second': turns / drill_seconds,
+        }
+
+    codecs = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, _STATE_FILE)
+        for codec in sorted(_CODECS):
+            started = time.perf_counter()
+            _save_state(state, path, 'none', codec)
+            save_seconds = time.perf_counter() - started
+            started = time.perf_counter()
+            _load_or_init_state(path)
+            load_seconds = time.perf_counter() - started
+            codecs[codec] = {
+                'bytes': os.path.getsize(path),
+                'save_seconds': save_seconds,
+                'load_seconds': load_seconds,
+            }
+
+    return {
+        'init_seconds': init_seconds,
+        'state_memory_bytes': state_memory,
+        'schedulers': schedulers,
+        'codecs': codecs,
+    }
+
+
+def _simulate(args):
+    options = {
+        name: getattr(args, name) for name in [
+            'budget', 'questions_per_day', 'seconds_per_question', 'initial_stability',
+            'stability_growth', 'exam_size', 'pass_mark', 'exams', 'vectorized',
+        ]
+    }
+    tasks = [
+        (scheduler, args.seed + learner, options)
+        for scheduler in args.schedulers for learner in range(args.learners)
+    ]
+    with concurrent.futures.ProcessPoolExecutor(args.processes) as executor:
+        outcomes = list(executor.map(_simulate_learner, tasks, chunksize=max(1, len(tasks) // 64)))
+
+    results = {}
+    for (scheduler, _, _), (mastered_at, pass_probability) in zip(tasks, outcomes):
+        result = results.setdefault(scheduler, {'mastered_at': [], 'pass_probability': []})
+        if mastered_at is not None:
+            result['mastered_at'].append(mastered_at)
+        result['pass_probability'].append(pass_probability)
+
+    report = {}
+    for scheduler, result in sorted(results.items()):
+        mastered_at = result['mastered_at']
+        report[scheduler] = {
+            'mastered': len(mastered_at) / args.learners,
+            'questions_to_mastery_mean': statistics.mean(mastered_at) if mastered_at else None,
+            'questions_to_mastery_median': statistics.median(mastered_at) if mastered_at else None,
+            'pass_probability': statistics.mean(result['pass_probability']),
+        }
+        print('{}: mastered {:.0%}, questions to mastery {} (median {}), exam pass probability {:.1%}'.format(
+            scheduler,
+            report[scheduler]['mastered'],
+            round(report[scheduler]['questions_to_mastery_mean']) if mastered_at else '-',
+            round(report[scheduler]['questions_to_mastery_median']) if mastered_at else '-',
+            report[scheduler]['pass_probability'],
+        ))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'options': options, 'learners': args.learners, 'seed': args.seed, 'results': report}, f, indent=2)
+            f.write('\n')
+
+
+def _simulate_learner(task):
+    scheduler_name, seed, options = task
+    rng = random.Random(seed)
+    count = len(_get_catalogue())
+    state = _init_state()
+    state['scheduler'] = scheduler_name
+    state['seed'] = seed
+    _SCHEDULERS[scheduler_name].prepare(state)
+    scheduler = _make_scheduler(state, options['vectorized'], rng=rng)
+
+    initial_stability = options['initial_stability'] * _DAY
+    stability = [0.0] * count
+    last_seen = [0.0] * count
+    now = [0.0]
+    recalled = [False]
+
+    def probability_correct(index, timestamp):
+        recall = math.exp(-(timestamp - last_seen[index]) / stability[index]) if stability[index] else 0
+        return recall + (1 - recall) / len(_LETTERS)
+
+    def choose(index, permutation):
+        recall = math.exp(-(now[0] - last_seen[index]) / stability[index]) if stability[index] else 0
+        recalled[0] = rng.random() < recall
+        return _LETTERS[permutation.index(0)] if recalled[0] else rng.choice(_LETTERS)
+
+    def observe(index, correct):
+        if recalled[0]:
+            stability[index] *= options['stability_growth']
+        else:
+            stability[index] = initial_stability
+        last_seen[index] = now[0]
+        now[0] += options['seconds_per_question']
+
+    mastered_at = []
+
+    def questions():
+        day = 0
+        for turn in range(options['budget']):
+            if turn and turn % options['questions_per_day'] == 0:
+                day += 1
+                now[0] = day * _DAY
+                if not mastered_at and statistics.mean(
+                        probability_correct(index, now[0]) for index in range(count)) >= options['pass_mark']:
+                    mastered_at.append(turn)
+            yield scheduler.pick()
+
+    frontend = _ScriptedFrontend(choose, observe)
+    _drill(state, scheduler, frontend, questions(), clock=lambda: now[0], rng=rng)
+
+    exam_time = (options['budget'] // options['questions_per_day'] + 1) * _DAY
+    probabilities = [probability_correct(index, exam_time) for index in range(count)]
+    required = math.ceil(options['pass_mark'] * options['exam_size'])
+    passed = 0
+    for _ in range(options['exams']):
+        exam = rng.sample(range(count), min(options['exam_size'], count))
+        passed += sum(rng.random() < probabilities[index] for index in exam) >= required
+
+    return (mastered_at[0] if mastered_at else None), passed / options['exams']
+
+
+def _serve(args):
+    if args.database:
+        storage = _SqliteStorage(args.database, args.durability)
+    else:
+        storage = _FileStorage(args.data_dir, args.durability, args.codec)
+    rollups = _Rollups(os.path.join(args.data_dir, _ROLLUPS_FILE), storage, args.durability)
+    server = _Server(storage, args.cache_size, args.vectorized, args.data_dir, rollups)
+    try:
+        asyncio.run(server.run(args.host, args.port, args.flush_interval))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+class _Server:
+    def __init__(self, storage, cache_size, vectorized=False, events_dir='learners', rollups=None):
+        self._storage = storage
+        self._events_dir = events_dir
+        self._rollups = rollups
+        self._cache_size = cache_size
+        self._vectorized = vectorized
+        self._learners = collections.OrderedDict()
+        self._dirty = {}
+        self._loading = {}
+        self._writer = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+    async def run(self, host, port, flush_interval):
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        except NotImplementedError:
+            pass
+        print('Serving on http://{}:{}/'.format(host, port))
+        try:
+            async with server:
+                await asyncio.gather(server.serve_forever(), self._flush_periodically(flush_interval))
+        finally:
+            await self.flush()
+            self._writer.shutdown()
+
+    async def _flush_periodically(self, flush_interval):
+        while True:
+            await asyncio.sleep(flush_interval)
+            await self.flush()
+
+    async def flush(self):
+        saves = [self._save_learner(learner_id) for learner_id in list(self._dirty)]
+        if self._rollups is not None:
+            saves.append(self._save_rollups())
+        for error in await asyncio.gather(*saves, return_exceptions=True):
+            if isinstance(error, Exception):
+                print('Cannot save: {}'.format(error), file=sys.stderr)
+
+    async def _save_learner(self, learner_id, indices=()):
+        indices = self._dirty.pop(learner_id, set()) | set(indices)
+        if not indices:
+            return
+        state = _copy_state(self._learners[learner_id]['state'])
+        try:
+            await asyncio.wrap_future(self._writer.submit(self._storage.save, learner_id, state, sorted(indices)))
+        except Exception:
+            self._dirty.setdefault(learner_id, set()).update(indices)
+            raise
+
+    async def _save_rollups(self):
+        dump = self._rollups.dump()
+        if dump is not None:
+            try:
+                await asyncio.wrap_future(self._writer.submit(self._rollups.write, dump))
+            except Exception:
+                self._rollups.mark_dirty()
+                raise
+
+    async def _get_learner(self, learner_id):
+        if not _LEARNER_ID.match(learner_id):
+            raise ValueError('invalid learner id: {}'.format(learner_id))
+
+        while learner_id not in self._learners:
+            loading = self._loading.get(learner_id)
+            if loading is None:
+                loading = self._loading[learner_id] = asyncio.ensure_future(self._load_learner(learner_id))
+            await asyncio.shield(loading)
+        self._learners.move_to_end(learner_id)
+        return self._learners[learner_id]
+
+    async def _load_learner(self, learner_id):
+        try:
+            state = await asyncio.wrap_future(self._writer.submit(self._storage.load, learner_id))
+        finally:
+            del self._loading[learner_id]
+
+        while len(self._learners) >= self._cache_size:
+            evicted_id = next(iter(self._learners))
+            if evicted_id in self._dirty:
+                await self._save_learner(evicted_id)
+            else:
+                self._learners.pop(evicted_id)['events'].close()
+
+        rng = random.Random(_session_seed(state))
+        self._learners[learner_id] = {
+            'state': state,
+            'rng': rng,
+            'scheduler': _make_scheduler(state, self._vectorized, rng=rng),
+            'events': _EventLog(os.path.join(self._events_dir, learner_id, _EVENTS_FILE)),
+        }
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                status, response = await self._dispatch(method, target, body)
+                payload = json.dumps(response).encode('utf-8')
+                writer.write('HTTP/1.1 {} {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\n\r\n'.format(
+                    status.value, status.phrase, len(payload)).encode('latin-1') + payload)
+                await writer.drain()
+
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, target, body):
+        parts = urllib.parse.urlsplit(target).path.strip('/').split('/')
+        if method == 'GET' and parts == ['dashboard'] and self._rollups is not None:
+            handler = self._dashboard
+        elif len(parts) == 3 and parts[0] == 'learners':
+            handler = {
+                ('GET', 'question'): self._pick,
+                ('GET', 'session'): self._pick_session,
+                ('POST', 'answer'): self._answer,
+                ('POST', 'answers'): self._answer_batch,
+                ('GET', 'stats'): self._stats,
+                ('GET', 'search'): self._search,
+            }.get((method, parts[2]))
+        else:
+            handler = None
+        if handler is None:
+            return http.HTTPStatus.NOT_FOUND, {'error': 'not found'}
+
+        try:
+            request = json.loads(body) if body else {}
+            if not isinstance(request, dict):
+                raise ValueError('request body must be a JSON object')
+            request.update(urllib.parse.parse_qsl(urllib.parse.urlsplit(target).query))
+            response = handler(parts[1] if len(parts) == 3 else None, request)
+            if asyncio.iscoroutine(response):
+                response = await response
+            return http.HTTPStatus.OK, response
+        except (KeyError, TypeError, ValueError, IndexError) as e:
+            return http.HTTPStatus.BAD_REQUEST, {'error': str(e)}
+        except Exception:
+            traceback.print_exc()
+            return http.HTTPStatus.INTERNAL_SERVER_ERROR, {'error': 'internal error'}
+
+    async def _pick(self, learner_id, request):
+        learner = await self._get_learner(learner_id)
+        return _question_payload(learner['state'], learner['scheduler'].pick(), learner['rng'])
+
+    async def _pick_session(self, learner_id, request):
+        learner = await self._get_learner(learner_id)
+        size = int(request.get('size', 20))
+        return {'questions': [
+            _question_payload(learner['state'], index, learner['rng']) for index in learner['scheduler'].pick_many(size)
+        ]}
+
+    async def _answer(self, learner_id, request):
+        learner = await self._get_learner(learner_id)
+        index = _check_question_id(request['id'])
+        question = _get_catalogue()[index]
+        correct, correct_letter = _check_answer(request['permutation'], request['answer'])
+        timestamp = time.time()
+        event = learner['events'].pack(
+            index, request['permutation'], request['answer'], _check_shown(request), timestamp)
+        learner['events'].write(event)
+        _record_answer(learner['state'], index, correct, timestamp)
+        if self._rollups is not None:
+            first = learner['state']['correct'][index] + learner['state']['incorrect'][index] == 1
+            self._rollups.record(learner_id, index, correct, timestamp, first)
+        learner['scheduler'].update(index)
+        self._dirty.setdefault(learner_id, set()).add(index)
+        return {
+            'correct': correct,
+            'correct_letter': correct_letter,
+            'correct_text': question['answers'][0]['text'],
+        }
+
+    async def _answer_batch(self, learner_id, request):
+        learner = await self._get_learner(learner_id)
+        records, results = _check_answers(request['answers'])
+        events = [
+            learner['events'].pack(index, answer['permutation'], answer['answer'], _check_shown(answer), timestamp)
+            for answer, (timestamp, index, correct) in zip(request['answers'], records)
+        ]
+        for event in events:
+            learner['events'].write(event)
+        _apply_answers(learner['state'], records)
+        if self._rollups is not None:
+            state = learner['state']
+            counts = collections.Counter(index for timestamp, index, correct in records)
+            for timestamp, index, correct in records:
+                first = counts[index] == state['correct'][index] + state['incorrect'][index]
+                self._rollups.record(learner_id, index, correct, timestamp, first)
+                counts[index] = -1
+        indices = {result['id'] for result in results}
+        for index in indices:
+            learner['scheduler'].update(index)
+        try:
+            await self._save_learner(learner_id, indices)
+        except Exception as e:
+            print('Cannot save learner {}: {}'.format(learner_id, e), file=sys.stderr)
+        return {'results': results}
+
+    async def _stats(self, learner_id, request):
+        state = (await self._get_learner(learner_id))['state']
+        return {'totals': _get_totals(state), 'sections': _get_section_totals(state)}
+
+    async def _search(self, learner_id, request):
+        state = (await self._get_learner(learner_id))['state']
+        results = _get_search_index().search(request['q'])
+        return {
+            'total': len(results),
+            'results': [
+                {
+                    'id': index,
+                    'text': _get_catalogue()[index]['text'],
+                    'correct_text': _get_catalogue()[index]['answers'][0]['text'],
+                    'correct': state['correct'][index],
+                    'incorrect': state['incorrect'][index],
+                }
+                for index in results[:int(request.get('limit', 20))]
+            ],
+        }
+
+    def _dashboard(self, learner_id, request):
+        return self._rollups.report(int(request.get('limit', 10)), int(request.get('min_attempts', 5)))
+
+
+class _Rollups:
+    def __init__(self, path, storage, durability='batch'):
+        self._path = path
+        self._durability = durability
+        self._catalogue = _get_catalogue_digest()
+        self._storage = storage
+        try:
+            with open(path, 'rb') as f:
+                data = _decode_json(f.read())
+        except (OSError, ValueError):
+            data = {}
+        if (data.get('catalogue') == self._catalogue and data.get('storage') == storage.identity
+                and data.get('revision') == storage.revision()):
+            self._questions = data['questions']
+            self._learners = data['learners']
+            self._dirty = False
+        else:
+            self.rebuild(storage)
+
+    def rebuild(self, storage):
+        self._questions = {}
+        self._learners = {}
+        hashes = _get_question_hashes()
+        sections = _get_sections()
+        for learner_id in storage.learners():
+            state = storage.load(learner_id)
+            learner = self._learner(learner_id)
+            for index, (correct, incorrect) in enumerate(zip(state['correct'], state['incorrect'])):
+                if correct or incorrect:
+                    learner['correct'] += correct
+                    learner['incorrect'] += incorrect
+                    learner['section_correct'][sections[index]] += correct
+                    learner['section_incorrect'][sections[index]] += incorrect
+                    learner['section_seen'][sections[index]] += 1
+                    question = self._questions.setdefault(hashes[index], [0, 0])
+                    question[0] += correct + incorrect
+                    question[1] += incorrect
+        self._dirty = True
+
+    def _learner(self, learner_id):
+        learner = self._learners.get(learner_id)
+        if learner is None:
+            learner = self._learners[learner_id] = {
+                'correct': 0,
+                'incorrect': 0,
+                'section_correct': [0] * len(_get_section_names()),
+                'section_incorrect': [0] * len(_get_section_names()),
+                'section_seen': [0] * len(_get_section_names()),
+                'last': None,
+            }
+        return learner
+
+    def record(self, learner_id, index, correct, timestamp, first):
+        learner = self._learner(learner_id)
+        section = _get_sections()[index]
+        outcome = 'correct' if correct else 'incorrect'
+        learner[outcome] += 1
+        learner['section_' + outcome][section] += 1
+        learner['section_seen'][section] += first
+        learner['last'] = max(learner['last'] or timestamp, timestamp)
+        question = self._questions.setdefault(_get_question_hashes()[index], [0, 0])
+        question[0] += 1
+        question[1] += not correct
+        self._dirty = True
+
+    def save(self):
+        dump = self.dump()
+        if dump is not None:
+            self.write(dump)
+
+    def mark_dirty(self):
+        self._dirty = True
+
+    def dump(self):
+        if not self._dirty:
+            return None
+        self._dirty = False
+        return _copy_state({'questions': self._questions, 'learners': self._learners})
+
+    def write(self, data):
+        os.makedirs(os.path.dirname(os.path.abspath(self._path)), exist_ok=True)
+        data = dict(data, catalogue=self._catalogue, storage=self._storage.identity, revision=self._storage.revision())
+        _write_file(self._path, _encode_json(data), self._durability)
+
+    def report(self, limit, min_attempts=5):
+        question_index = _get_question_index()
+        hardest = sorted(
+            (
+                (wrong / attempts, attempts, question_index[digest])
+                for digest, (attempts, wrong) in self._questions.items()
+                if digest in question_index and attempts >= min_attempts
+            ),
+            reverse=True)
+        section_sizes = [len(members) for members in _get_section_members()]
+
+        sections = [
+            {'name': name, 'correct': 0, 'incorrect': 0, 'readiness': 0, 'ready': 0} for name in _get_section_names()
+        ]
+        learners = []
+        for learner_id, learner in self._learners.items():
+            readiness = 0
+            for section, totals in enumerate(sections):
+                correct = learner['section_correct'][section]
+                attempts = correct + learner['section_incorrect'][section]
+                section_readiness = learner['section_seen'][section] / section_sizes[section] * correct / attempts \
+                    if attempts else 0
+                totals['correct'] += correct
+                totals['incorrect'] += attempts - correct
+                totals['readiness'] += section_readiness
+                totals['ready'] += section_readiness >= _EXAM_PASS_MARK
+                readiness += section_readiness * section_sizes[section]
+            learners.append({
+                'learner': learner_id,
+                'readiness': readiness / len(question_index),
+                'correct': learner['correct'],
+                'incorrect': learner['incorrect'],
+                'last': learner['last'],
+            })
+        for totals in sections:
+            totals['readiness'] /= max(1, len(learners))
+
+        learners.sort(key=lambda learner: (learner['readiness'], learner['last'] or 0))
+        return {
+            'learners': len(learners),
+            'hardest': [
+                {
+                    'id': index,
+                    'text': _get_catalogue()[index]['text'],
+                    'attempts': attempts,
+                    'error_rate': error_rate,
+                }
+                for error_rate, attempts, index in hardest[:limit]
+            ],
+            'at_risk': [learner for learner in learners if learner['readiness'] < _EXAM_PASS_MARK][:limit],
+            'sections': sections,
+        }
+
+
+def _dashboard(args):
+    if args.database:
+        storage = _SqliteStorage(args.database)
+    else:
+        storage = _FileStorage(args.data_dir)
+    rollups = _Rollups(os.path.join(args.data_dir, _ROLLUPS_FILE), storage)
+    if args.rebuild:
+        rollups.rebuild(storage)
+    rollups.save()
+    report = rollups.report(args.limit, args.min_attempts)
+
+    print('{} learners'.format(report['learners']))
+    print()
+    print('Readiness per section:')
+    for section in report['sections']:
+        attempts = section['correct'] + section['incorrect']
+        print('  {}: readiness {:.0%}, {} learners ready, accuracy {}'.format(
+            section['name'], section['readiness'], section['ready'],
+            '{:.0%}'.format(section['correct'] / attempts) if attempts else '-'))
+    print()
+    print('Hardest questions:')
+    for question in report['hardest']:
+        print('  {:.0%} wrong of {}: {}'.format(question['error_rate'], question['attempts'], question['text']))
+    print()
+    print('Learners at risk:')
+    for learner in report['at_risk']:
+        last = 'never' if learner['last'] is None else time.strftime('%Y-%m-%d', time.localtime(learner['last']))
+        print('  {}: readiness {:.0%}, {} correct, {} incorrect, last answer {}'.format(
+            learner['learner'], learner['readiness'], learner['correct'], learner['incorrect'], last))
         
 
-def _init_state():
-    state = {'q': []}
-    lines = QUESTIONS.splitlines()
-    line_index = 1
-    question_index = 1
-
-    while line_index < len(lines):
-        question = lines[line_index]
-        assert question.startswith('{} '.format(question_index)), question_index
-
-        line_index += 2
-        answers = []
-        for letter in ['A', 'B', 'C', 'D']:
-            answer = lines[line_index]
-            prefix = '{} '.format(letter)
-            assert answer.startswith(prefix), answer
-            answers.append({'letter': letter, 'text': answer[len(prefix):]})
-            line_index += 1
-
-        line_index += 1
-        question_index += 1
-
-        state['q'].append({'text': question, 'answers': answers, 'correct': 0, 'incorrect': 0})
-    
-    return state
-        
+def _copy_state(state):
+    copy = dict(state)
+    for key, value in state.items():
+        if isinstance(value, dict):
+            copy[key] = _copy_state(value)
+        elif isinstance(value, list) and key != 'hashes':
+            copy[key] = list(value)
+    return copy
 
 
+def _init_state():
+    count = len(_get_catalogue())
+    return {
+        'version': _STATE_VERSION,
+        'generation': 0,
+        'correct': [0] * count,
+        'incorrect': [0] * count,
+        'totals': _compute_totals([0] * count, [0] * count),
+        'scheduler': 'classic',
+        'hashes': _get_question_hashes(),
+        'seed': random.getrandbits(63),
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _get_sections():
+    catalogue = _get_catalogue()
+    if isinstance(catalogue, _MappedCatalogue):
+        return catalogue.section_ids()
+    return [question['section'] for question in catalogue]
+
+
+def _get_section_names():
+    return _get_catalogue().sections
+
+
+@functools.lru_cache(maxsize=None)
+def _get_section_members():
+    members = [[] for _ in _get_section_names()]
+    for index, section in enumerate(_get_sections()):
+        members[section].append(index)
+    return members
+
+
+@functools.lru_cache(maxsize=None)
+def _get_question_hashes():
+    catalogue = _get_catalogue()
+    if isinstance(catalogue, _MappedCatalogue):
+        return catalogue.hashes()
+    return [question['hash'].hex() for question in catalogue]
+
+
+@functools.lru_cache(maxsize=None)
+def _get_question_hashes_digest():
+    return _hashes_digest(_get_question_hashes())
+
+
+@functools.lru_cache(maxsize=None)
+def _get_question_index():
+    return {digest: index for index, digest in enumerate(_get_question_hashes())}
+
+
+@functools.lru_cache(maxsize=None)
+def _get_catalogue_digest():
+    catalogue = [_get_question_hashes(), _get_sections(), _get_section_names()]
+    return hashlib.sha256(json.dumps(catalogue).encode('utf-8')).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _get_search_index():
+    try:
+        with open(_SEARCH_INDEX_FILE, 'rb') as f:
+            data = _decode_json(f.read())
+        if data.get('catalogue') == _get_catalogue_digest():
+            return _SearchIndex(data['terms'])
+    except (OSError, ValueError):
+        pass
+
+    terms = collections.defaultdict(list)
+    for index, question in enumerate(_get_catalogue()):
+        texts = [_QUESTION_NUMBER.sub('', question['text'], 1)] + [answer['text'] for answer in question['answers']]
+        text = '\n'.join(texts)
+        for term in sorted(set(_search_terms(text))):
+            terms[term].append(index)
+    try:
+        data = {'catalogue': _get_catalogue_digest(), 'terms': dict(terms)}
+        _write_file(_SEARCH_INDEX_FILE, _encode_json(data), 'none')
+    except OSError as e:
+        print('Cannot cache the search index: {}'.format(e), file=sys.stderr)
+    return _SearchIndex(terms)
+
+
+class _SearchIndex:
+    def __init__(self, terms):
+        self._terms = terms
+        self._vocabulary = sorted(terms)
+
+    def search(self, query):
+        results = None
+        for term in set(_search_terms(query)):
+            matches = set()
+            position = bisect.bisect_left(self._vocabulary, term)
+            while position < len(self._vocabulary) and self._vocabulary[position].startswith(term):
+                matches.update(self._terms[self._vocabulary[position]])
+                position += 1
+            results = matches if results is None else results & matches
+        return sorted(results or ())
+
+
+def _search_terms(text):
+    text = unicodedata.normalize('NFKC', text).casefold().translate(_SEARCH_UMLAUTS)
+    for token in _SEARCH_TOKEN.findall(_SEARCH_ABBREVIATION_DOT.sub('', text)):
+        parts = token.split('-')
+        if len(parts) > 1:
+            yield ''.join(parts)
+        for part in parts:
+            if part not in _SEARCH_STOPWORDS:
+                yield part
+
+
+def _get_catalogue():
+    global _catalogue
+    if _catalogue is None:
+        _catalogue = _load_catalogue()
+    return _catalogue
+
+
+def _set_catalogue(catalogue):
+    global _catalogue
+    _catalogue = catalogue
+    _get_sections.cache_clear()
+    _get_section_members.cache_clear()
+    _get_question_hashes.cache_clear()
+    _get_question_index.cache_clear()
+    _get_question_hashes_digest.cache_clear()
+    _get_catalogue_digest.cache_clear()
+    _get_search_index.cache_clear()
+
+
+def _load_catalogue(sources=None):
+    if sources and len(sources) == 1 and _is_compiled(sources[0]):
+        return _MappedCatalogue(sources[0])
+    path = _compiled_path(sources)
+    if _is_compiled(path) and os.path.getmtime(path) >= max(map(os.path.getmtime, _source_paths(sources))):
+        return _MappedCatalogue(path)
+    if not sources:
+        catalogue = _ParsedCatalogue()
+        for section, text, texts, digest in _merge_questions(sources):
+            catalogue.append({
+                'text': text,
+                'answers': _make_answers(texts),
+                'hash': digest,
+                'section': catalogue.section_id(section),
+            })
+        return catalogue
+    _compile_catalogue(sources, path)
+    return _MappedCatalogue(path)
+
+
+def _source_paths(sources):
+    return sources or [os.path.abspath(__file__)]
+
+
+def _compiled_path(sources):
+    if not sources:
+        return _CATALOGUE_FILE
+    if len(sources) == 1:
+        return sources[0] + '.bin'
+    digest = hashlib.sha256('\0'.join(map(os.path.abspath, sources)).encode('utf-8')).hexdigest()
+    return '{}.merged-{}.bin'.format(sources[0], digest[:8])
+
+
+def _is_compiled(path):
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(_CATALOGUE_HEADER.size)
+    except OSError:
+        return False
+    return len(header) == _CATALOGUE_HEADER.size and _CATALOGUE_HEADER.unpack(header)[:2] == (
+        _CATALOGUE_MAGIC, _CATALOGUE_VERSION)
+
+
+def _merge_questions(sources):
+    seen = set()
+    for source in sources or [None]:
+        with _open_catalogue_source(source) as lines:
+            for section, text, texts in _parse_questions(lines, source or 'QUESTIONS'):
+                digest = _question_hash(text, texts)
+                if digest not in seen:
+                    seen.add(digest)
+                    yield section, text, texts, digest
+
+
+def _question_hash(text, texts):
+    fields = [_normalize_text(_QUESTION_NUMBER.sub('', text, 1))] + [_normalize_text(texts[0])]
+    fields += sorted(map(_normalize_text, texts[1:]))
+    return hashlib.blake2b('\0'.join(fields).encode('utf-8'), digest_size=_CATALOGUE_HASH_SIZE).digest()
+
+
+def _normalize_text(text):
+    return ' '.join(unicodedata.normalize('NFKC', text).casefold().split())
+
+
+class _ParsedCatalogue(list):
+    def __init__(self):
+        super().__init__()
+        self.sections = []
+        self._section_ids = {}
+
+    def section_id(self, name):
+        if name not in self._section_ids:
+            self._section_ids[name] = len(self.sections)
+            self.sections.append(name)
+        return self._section_ids[name]
+
+
+class _SyntheticCatalogue:
+    def __init__(self, count):
+        self._count = count
+        self.sections = ['Section {}'.format(section + 1) for section in range(min(count, 12))]
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        text = '{} Synthetic question {}?'.format(index + 1, index + 1)
+        texts = ['Answer {} to question {}'.format(letter, index + 1) for letter in _LETTERS]
+        return {
+            'text': text,
+            'answers': _make_answers(texts),
+            'hash': _question_hash(text, texts),
+            'section': index * len(self.sections) // self._count,
+        }
+
+
+def _make_answers(texts):
+    return [{'letter': letter, 'text': text} for letter, text in zip(_LETTERS, texts)]
+
+
+class _MappedCatalogue:
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self._count = _CATALOGUE_HEADER.unpack_from(self._map)
+        assert magic == _CATALOGUE_MAGIC and version == _CATALOGUE_VERSION, path
+        self._hashes = _CATALOGUE_HEADER.size + (self._count + 1) * _CATALOGUE_OFFSET.size
+        self._sections = self._hashes + self._count * _CATALOGUE_HASH_SIZE
+        position = self._sections + self._count * _CATALOGUE_SECTION.size
+        length, = _CATALOGUE_OFFSET.unpack_from(self._map, position)
+        position += _CATALOGUE_OFFSET.size
+        self.sections = self._map[position:position + length].decode('utf-8').split('\n')
+        self._blob = position + length
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        position = _CATALOGUE_HEADER.size + index * _CATALOGUE_OFFSET.size
+        start, = _CATALOGUE_OFFSET.unpack_from(self._map, position)
+        end, = _CATALOGUE_OFFSET.unpack_from(self._map, position + _CATALOGUE_OFFSET.size)
+        text, *texts = self._map[self._blob + start:self._blob + end].decode('utf-8').split('\n')
+        position = self._hashes + index * _CATALOGUE_HASH_SIZE
+        digest = self._map[position:position + _CATALOGUE_HASH_SIZE]
+        section, = _CATALOGUE_SECTION.unpack_from(self._map, self._sections + index * _CATALOGUE_SECTION.size)
+        return {'text': text, 'answers': _make_answers(texts), 'hash': digest, 'section': section}
+
+    def hashes(self):
+        table = self._map[self._hashes:self._sections].hex()
+        size = _CATALOGUE_HASH_SIZE * 2
+        return [table[position:position + size] for position in range(0, len(table), size)]
+
+    def section_ids(self):
+        sections = array.array(_CATALOGUE_SECTION.format[-1])
+        sections.frombytes(self._map[self._sections:self._sections + self._count * _CATALOGUE_SECTION.size])
+        if sys.byteorder != 'little':
+            sections.byteswap()
+        return sections.tolist()
+
+
+def _compile_catalogue(sources, path):
+    offsets = array.array('I', [0])
+    hashes = bytearray()
+    sections = array.array(_CATALOGUE_SECTION.format[-1])
+    section_ids = {}
+    directory = os.path.dirname(os.path.abspath(path))
+    prefix = os.path.basename(path) + '.'
+    blob_fd, blob_file = tempfile.mkstemp(prefix=prefix, suffix='.blob', dir=directory)
+    temp_file = None
+    try:
+        with open(blob_fd, 'wb') as blob:
+            for section, text, texts, digest in _merge_questions(sources):
+                record = '\n'.join([text] + texts).encode('utf-8')
+                blob.write(record)
+                offsets.append(offsets[-1] + len(record))
+                hashes += digest
+                sections.append(section_ids.setdefault(section, len(section_ids)))
+
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+            sections.byteswap()
+        names = '\n'.join(section_ids).encode('utf-8')
+        temp_fd, temp_file = tempfile.mkstemp(prefix=prefix, suffix='.tmp', dir=directory)
+        with open(temp_fd, 'wb') as f, open(blob_file, 'rb') as blob:
+            f.write(_CATALOGUE_HEADER.pack(_CATALOGUE_MAGIC, _CATALOGUE_VERSION, len(offsets) - 1))
+            f.write(offsets.tobytes())
+            f.write(hashes)
+            f.write(sections.tobytes())
+            f.write(_CATALOGUE_OFFSET.pack(len(names)))
+            f.write(names)
+            shutil.copyfileobj(blob, f)
+        os.chmod(temp_file, 0o644)
+        os.replace(temp_file, path)
+    finally:
+        for name in (blob_file, temp_file):
+            if name is not None and os.path.exists(name):
+                os.remove(name)
+    print('Compiled {} questions into {}'.format(len(offsets) - 1, path), file=sys.stderr)
+
+
+def _open_catalogue_source(source):
+    if source is None:
+        return io.StringIO(QUESTIONS)
+    return open(source, encoding='utf-8')
+
+
+def _parse_questions(lines, source='QUESTIONS'):
+    section = os.path.splitext(os.path.basename(source))[0]
+    expected = 1
+    question = None
+    answers = []
+    line_number = 0
+
+    for line_number, line in enumerate(lines, 1):
+        line = line.rstrip('\r\n')
+        if not line.strip():
+            continue
+
+        if question is None:
+            if line.startswith('#'):
+                section = line.lstrip('#').strip()
+                continue
+            if not line.startswith('{} '.format(expected)):
+                raise ValueError('{}:{}: expected question {}, got {!r}'.format(source, line_number, expected, line))
+            question = line
+            continue
+
+        letter = _LETTERS[len(answers)]
+        if not line.startswith('{} '.format(letter)):
+            raise ValueError('{}:{}: expected answer {} of question {}, got {!r}'.format(
+                source, line_number, letter, expected, line))
+        answers.append(line[len(letter) + 1:])
+
+        if len(answers) == len(_LETTERS):
+            yield section, question, answers
+            expected += 1
+            question = None
+            answers = []
+
+    if question is not None:
+        raise ValueError('{}:{}: question {} has {} of {} answers'.format(
+            source, line_number, expected, len(answers), len(_LETTERS)))
+
+
+_catalogue = None
+
 QUESTIONS = """
+# Rechtliche Grundlagen
+
 1 Welche zwischenstaatliche Organisation hat für den weltweiten Flugfunkdienst besondere Bedeutung?
 
 A ITU
@@ -178,6 +2454,8 @@ B BZF II
 C Kein Flugfunkzeugnis, da es sich um einen VFR-Flug handelt
 D Kein Flugfunkzeugnis, wenn der Fluglehrer einen schriftlichen Flugauftrag erteilt hat
 
+# Begriffe und Abkürzungen
+
 10 Was ist eine Luftfunkstelle? Eine Funkstelle ...
 
 A des beweglichen Flugfunkdienstes an Bord eines Luftfahrzeuges
@@ -346,6 +2624,8 @@ B den Ausfall von Funknavigationsanlagen an Bord eines Luftfahrzeuges betreffen
 C der Übermittlung von QNH-Werten dienen
 D den Ausfall von Funknavigationsanlagen am Boden betreffen
 
+# Meldungsarten und Rangfolge
+
 34 Welche Meldungsart steht in der Rangfolge vor den Flugsicherheitsmeldungen?
 
 A Peilfunkmeldung
@@ -416,6 +2696,8 @@ B niedriger als "LANDUNG FREI"
 C höher als "SENDEN SIE FÜR PEILUNG"
 D höher als "BEACHTEN SIE BAUARBEITEN LINKS DER ROLLBAHN G"
 
+# Übermittlung von Buchstaben und Zahlen
+
 44 Wie wird die Uhrzeit im Flugfunkdienst übermittelt, wenn Verwechslungen ausgeschlossen sind?
 
 A In Minuten, zweistellig
@@ -465,6 +2747,8 @@ B dreizehn eins acht
 C dreizehn achtzehn
 D eins acht nach dreizehn Uhr
 
+# Rufzeichen
+
 51 Wie lautet das Rufzeichen einer Bodenfunkstelle an einem kontrollierten Flugplatz für die Bewegungslenkung auf dem Rollfeld?
 
 A ROLLKONTROLLE
@@ -556,6 +2840,8 @@ B Flugfernmeldedienst
 C Flugnavigationsdienst
 D Flugberatungsdienst
 
+# Redewendungen und Sprechgruppen
+
 64 Welche Redewendung ist anzuwenden, wenn bei einem Anruf das Rufzeichen der rufenden Funkstelle nicht verstanden wurde?
 
 A WIEDERHOLEN SIE IHR RUFZEICHEN
@@ -682,6 +2968,8 @@ B Querab rechts
 C Rechts voraus
 D In Flugrichtung voraus
 
+# Sprechfunkverfahren
+
 82 Wann ist ein Einleitungsanruf abzusetzen?
 
 A Bei Herstellung des ersten Funkkontaktes
@@ -962,6 +3250,8 @@ B Luftfahrzeugkennung, Startflugplatz, Startzeit
 C Luftfahrzeugkennung, Startflugplatz, Zielflugplatz
 D Luftfahrzeugkennung, Startzeit, Zielflugplatz
 
+# Wetterinformationen
+
 122 Wenn die Bewölkung über Sprechfunk mit "LOCKERE BEWÖLKUNG (SCATTERED)" angegeben wird, dann beträgt der Bedeckungsgrad:
 
 A 3 bis 4 Achtel
@@ -1060,6 +3350,8 @@ B Angabe der Wolkenuntergrenze in Lufträumen der Klassen F und G
 C Routinewettermeldungen
 D Meteorologische Angaben in Kartenform, erhältlich bei Flugwetterwarten
 
+# Not-, Dringlichkeits- und Ausfallverfahren
+
 136 Welche Angaben soll eine Notmeldung enthalten?
 
 A Art der Notlage, Absichten des Luftfahrzeugführers, Art der gewünschten Hilfe, Angaben über Standort, Kurs und Flughöhe
@@ -1179,6 +3471,8 @@ B Lichtsignale
 C Bodensignale
 D Leuchtgeschosse, die in Abständen von ca. 10 Sekunden abgefeuert werden und sich in rote und grüne Lichter und Sterne zerlegen
 
+# Frequenzen und Ausbreitung
+
 153 In welchem Frequenzbereich wird der Sprechfunkverkehr im zivilen beweglichen Flugfunkdienst abgewickelt?
 
 A 117,975 MHz – 137,000 MHz
@@ -1256,6 +3550,8 @@ B Ca. 20 NM
 C Ca. 10 NM
 D Ca. 150 NM
 
+# Luftrecht, Luftraum und Flugverkehrsdienste
+
 164 Welche Flugverkehrsdienste gibt es?
 
 A Flugverkehrskontrolldienst, Flugalarmdienst, Fluginformationsdienst, Flugverkehrsberatungsdienst
@@ -1725,6 +4021,8 @@ B Transponder mit automatischer Höhenübermittlung ausgerüstet sein und den Co
 C Transponder mit automatischer Höhenübermittlung ausgerüstet sein und den Code 7600 unaufgefordert abstrahlen
 D Transponder mit automatischer Höhenübermittlung ausgerüstet sein und den Code 7700 unaufgefordert abstrahlen
 
+# Navigation und Radar
+
 231 Was versteht man unter dem Begriff "EIGENPEILUNG"?
 
 A Standortbestimmung durch bordeigene Navigationsempfangsanlagen